@@ -0,0 +1,722 @@
+#!/usr/bin/env python3
+"""
+シークレット漏洩スキャナー
+
+SecretClassifierの分類パターンを再利用し、以下に含まれる機密情報を検出します：
+- gitの全履歴（`git cat-file --batch` でblobをストリーム読み出し）
+- ステージ済みのインデックス（次のコミットに含まれる内容）
+- ワーキングツリーの変更・未追跡ファイル（未変更の追跡ファイルは履歴側で検出）
+
+同一内容のblobはオブジェクトハッシュで重複排除し、実行中一度だけスキャンします。
+
+`--cache` を指定すると、検出のなかったblobのオブジェクトハッシュを記録し、
+次回以降はスキップします。検出結果は見つかり次第逐次出力します。
+
+誤検出は `.secretscanignore`（パスのglobと任意のキー名）または
+行内の `scan-secrets: ignore` マーカーで抑止できます。
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import heapq
+import json
+import mmap
+import os
+import queue
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+from collections import deque
+from dataclasses import dataclass, asdict
+from multiprocessing import Pool
+from typing import BinaryIO, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from classify_secrets import SecretClassifier
+
+# 1ワーカーあたりの処理待ちblob数の上限（メモリ使用量を一定に保つ）
+INFLIGHT_PER_WORKER = 8
+
+# キャッシュ形式・検出ロジックを変更したら上げる（既存キャッシュを無効化）
+CACHE_VERSION = 3
+CACHE_MAGIC = b'scan-secrets-cache'
+# キャッシュ追記時にメモリ上でソートする件数の上限
+CACHE_CHUNK_SIZE = 1 << 16
+
+# オブジェクト形式ごとのハッシュ長（16進数）
+OID_HEX_WIDTH = {'sha1': 40, 'sha256': 64}
+
+DEFAULT_IGNORE_FILE = '.secretscanignore'
+INLINE_IGNORE_MARKER = 'scan-secrets: ignore'
+
+# KEY=VALUE / KEY: VALUE / "KEY": "VALUE" / export KEY=VALUE / env["KEY"] = VALUE 形式
+# 引用符なしの値は区切り文字・行末までを一語として扱うため、直後に ( 等が続く
+# 関数呼び出しは一致しない（属性参照は is_secret_value で除外）。
+ASSIGNMENT_RE = re.compile(
+    r'''(?:^|[\s{\[,;(])(?:export\s+)?["']?(?P<key>[A-Za-z_][A-Za-z0-9_]*)["']?\]?\s*[:=](?!=)\s*'''
+    r'''(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^"'\s,;#(){}\[\]]+)(?=[\s"',;#}\]]|$))'''
+)
+# gh secret set KEY --body "VALUE" 形式（github-secrets.sh等）
+GH_SECRET_RE = re.compile(
+    r'''gh\s+secret\s+set\s+(?P<key>\S+)\s+--body\s+'''
+    r'''(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>\S+))'''
+)
+
+# テンプレート用のダミー値（.env.example等）は検出対象外（実際の値を隠さないよう完全一致のみ）
+PLACEHOLDER_RE = re.compile(
+    r'^(?:your_\w*|\w*_here'                       # your_api_key_here 等
+    r'|(?:new|old|dummy|sample|example)_[a-z_]+'    # new_access_key_id 等の説明的な値
+    r'|\$\{?\w+\}?|\$\{\{.*\}\}'                    # $VAR, ${VAR}, ${{ secrets.X }}
+    r'|\{self\.\w+\}|<[\w\s-]*>'                   # {self.api_key}, <api-key>
+    r'|\*+|x{3,}|X{3,}|changeme|password|(?i:none|null|true|false))$'
+)
+# settings.api_key 等の属性参照（引用符なしの値のみ）
+CODE_REFERENCE_RE = re.compile(r'^[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)+$')
+
+# シークレットパターンに一致しても機密情報ではない変数名
+NON_SECRET_KEY_PATTERNS = [
+    r'.*_REGION$',        # AWS_REGION, AWS_DEFAULT_REGION等
+    r'.*_NAME$',          # AWS_SECRET_NAME, DATABASE_NAME等
+    r'.*_PROFILE$',       # AWS_PROFILE等
+    r'.*_OUTPUT$',        # AWS_DEFAULT_OUTPUT等
+    r'.*_USERNAME$',      # DOCKER_USERNAME等
+    r'.*_ACCOUNT_ID$',    # AWS_ACCOUNT_ID等
+]
+
+
+@dataclass
+class Finding:
+    """シークレット検出結果"""
+    source: str        # 'history'、'index' または 'worktree'
+    path: str          # 検出されたファイルパス
+    line: int          # 行番号
+    key: str           # 変数名
+    category: str      # 'aws' または 'github'
+    masked_value: str  # マスク済みの値
+    blob: str          # blobのオブジェクトハッシュ
+
+
+class SecretLeakScanner:
+    """テキスト中のシークレット代入を検出するクラス"""
+
+    def __init__(self, classifier: Optional[SecretClassifier] = None):
+        self.classifier = classifier or SecretClassifier()
+        self.sensitive_patterns = [
+            re.compile(p) for p in self.classifier.aws_patterns + self.classifier.github_patterns
+        ]
+        self.non_secret_patterns = [re.compile(p) for p in NON_SECRET_KEY_PATTERNS]
+
+    def fingerprint(self) -> str:
+        """
+        検出ロジックの識別子（キャッシュの有効性判定に使用）
+        """
+        parts = [
+            str(CACHE_VERSION),
+            *self.classifier.github_patterns,
+            *self.classifier.local_patterns,
+            *self.classifier.aws_patterns,
+            *NON_SECRET_KEY_PATTERNS,
+            ASSIGNMENT_RE.pattern,
+            GH_SECRET_RE.pattern,
+            PLACEHOLDER_RE.pattern,
+            CODE_REFERENCE_RE.pattern,
+            INLINE_IGNORE_MARKER,
+        ]
+        return hashlib.sha256('\0'.join(parts).encode()).hexdigest()[:16]
+
+    def categorize(self, key: str) -> Optional[str]:
+        """
+        変数名を分類し、シークレットであればカテゴリを返す
+
+        classify_secretのデフォルト（安全側のaws）は誤検出の元になるため、
+        AWS/GitHubパターンに明示的に一致した場合のみ対象とします。
+        """
+        key_upper = key.upper()
+        if any(p.match(key_upper) for p in self.non_secret_patterns):
+            return None
+        category = self.classifier.classify_secret(key, '')
+        if category == 'local':
+            return None
+        if not any(p.match(key_upper) for p in self.sensitive_patterns):
+            return None
+        return category
+
+    def is_secret_value(self, value: str, quoted: bool) -> bool:
+        """値がダミー値・コード式・認証情報なしのURLでないか判定する"""
+        if len(value) < 4 or PLACEHOLDER_RE.match(value):
+            return False
+        if not quoted and CODE_REFERENCE_RE.match(value):
+            return False
+        if '://' in value:
+            try:
+                password = urlsplit(value).password
+            except ValueError:
+                return True
+            return bool(password) and not PLACEHOLDER_RE.match(password)
+        return True
+
+    def scan_text(self, text: str) -> Iterator[Tuple[int, str, str, str]]:
+        """
+        テキストを走査し (行番号, 変数名, カテゴリ, マスク済みの値) を返す
+        """
+        for line_num, line in enumerate(text.splitlines(), 1):
+            if INLINE_IGNORE_MARKER in line:
+                continue
+            matches = list(GH_SECRET_RE.finditer(line)) or ASSIGNMENT_RE.finditer(line)
+            for match in matches:
+                bare = match.group('bare')
+                if bare is not None:
+                    value, quoted = bare, False
+                else:
+                    value = match.group('dq') if match.group('dq') is not None else match.group('sq')
+                    quoted = True
+                if not self.is_secret_value(value, quoted):
+                    continue
+                key = match.group('key')
+                category = self.categorize(key)
+                if category is None:
+                    continue
+                masked_value = value[:8] + "..." if len(value) > 8 else "***"
+                yield line_num, key, category, masked_value
+
+
+# ---- ワーカープロセス ----
+
+_worker_scanner: Optional[SecretLeakScanner] = None
+
+
+def _init_worker() -> None:
+    global _worker_scanner
+    _worker_scanner = SecretLeakScanner()
+
+
+def _scan_blob(task: Tuple[str, str, str, bytes]) -> Tuple[str, List[Finding]]:
+    source, oid, path, data = task
+    if b'\0' in data[:8000]:
+        # バイナリファイルはスキップ
+        return oid, []
+    text = data.decode('utf-8', errors='replace')
+    findings = [
+        Finding(source, path, line_num, key, category, masked_value, oid)
+        for line_num, key, category, masked_value in _worker_scanner.scan_text(text)
+    ]
+    return oid, findings
+
+
+# ---- オブジェクトハッシュの集合・キャッシュ ----
+
+def _contains_record(buffer: mmap.mmap, offset: int, count: int, size: int, target: bytes) -> bool:
+    """ソート済み固定長レコードを二分探索する"""
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        start = offset + mid * size
+        record = buffer[start:start + size]
+        if record < target:
+            lo = mid + 1
+        elif record > target:
+            hi = mid
+        else:
+            return True
+    return False
+
+
+def _iter_records(buffer: mmap.mmap, offset: int, count: int, size: int) -> Iterator[bytes]:
+    for index in range(count):
+        start = offset + index * size
+        yield buffer[start:start + size]
+
+
+class OidRunSet:
+    """
+    オブジェクトハッシュの集合
+
+    一定件数ごとにソートして一時ファイルへ退避し、参照はmmap上の二分探索で行うため、
+    件数に関わらずメモリ使用量は一定です。
+    """
+
+    def __init__(self, width: int, directory: Optional[str] = None):
+        self.record_size = width + 1
+        self._directory = directory
+        self._pending: Set[bytes] = set()
+        self._runs: List[Tuple[BinaryIO, mmap.mmap]] = []
+        self._added = 0
+
+    def __len__(self) -> int:
+        return self._added
+
+    def add(self, oid: str) -> None:
+        self._pending.add(oid.encode() + b'\n')
+        self._added += 1
+        if len(self._pending) >= CACHE_CHUNK_SIZE:
+            self._flush_run()
+
+    def _flush_run(self) -> None:
+        run = tempfile.TemporaryFile(dir=self._directory)
+        run.writelines(sorted(self._pending))
+        run.flush()
+        self._runs.append((run, mmap.mmap(run.fileno(), 0, access=mmap.ACCESS_READ)))
+        self._pending = set()
+
+    def __contains__(self, oid: str) -> bool:
+        target = oid.encode() + b'\n'
+        return target in self._pending or any(
+            _contains_record(buffer, 0, len(buffer) // self.record_size, self.record_size, target)
+            for _, buffer in self._runs
+        )
+
+    def __iter__(self) -> Iterator[bytes]:
+        """全レコードをソート順に返す（重複を含む場合あり）"""
+        runs = [
+            _iter_records(buffer, 0, len(buffer) // self.record_size, self.record_size)
+            for _, buffer in self._runs
+        ]
+        return heapq.merge(sorted(self._pending), *runs)
+
+    def close(self) -> None:
+        for run, buffer in self._runs:
+            buffer.close()
+            run.close()
+        self._runs = []
+        self._pending = set()
+
+
+class ScanCache:
+    """
+    検出のなかったblobのオブジェクトハッシュを保持するキャッシュ
+
+    ファイルはヘッダー行（形式・検出ロジックの識別子・ハッシュ長）と、
+    ソート済みの固定長レコード（16進数ハッシュ + 改行）で構成されます。
+    参照はmmap上の二分探索、追記分は OidRunSet に退避して終了時にマージするため、
+    blob数に関わらずメモリ使用量は一定です。
+    """
+
+    def __init__(self, path: Optional[str], fingerprint: str, width: int):
+        self.path = path
+        self.header = b'%s %s %d\n' % (CACHE_MAGIC, fingerprint.encode(), width)
+        self.record_size = width + 1
+        self._file: Optional[BinaryIO] = None
+        self._map: Optional[mmap.mmap] = None
+        self._count = 0
+        self._added: Optional[OidRunSet] = None
+        if path:
+            self._added = OidRunSet(width, os.path.dirname(os.path.abspath(path)))
+            if os.path.exists(path):
+                self._open_existing()
+
+    def _open_existing(self) -> None:
+        f = open(self.path, 'rb')
+        size = os.fstat(f.fileno()).st_size - len(self.header)
+        if f.readline() != self.header or size < self.record_size:
+            # 検出ロジックやハッシュ形式が異なるキャッシュは使わない
+            f.close()
+            return
+        self._file = f
+        self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._count = size // self.record_size
+
+    def __contains__(self, oid: str) -> bool:
+        if not self._map:
+            return False
+        target = oid.encode() + b'\n'
+        return _contains_record(self._map, len(self.header), self._count, self.record_size, target)
+
+    def add(self, oid: str) -> None:
+        if self._added is not None:
+            self._added.add(oid)
+
+    def close(self) -> None:
+        """追記分を既存レコードとマージして書き出す"""
+        try:
+            if self._added is not None and (len(self._added) or not self._map):
+                self._write_merged()
+        finally:
+            if self._added is not None:
+                self._added.close()
+            if self._map:
+                self._map.close()
+                self._map = None
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def _write_merged(self) -> None:
+        existing = (_iter_records(self._map, len(self.header), self._count, self.record_size)
+                    if self._map else iter(()))
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.scan-secrets-cache-')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                out.write(self.header)
+                previous = None
+                for record in heapq.merge(existing, iter(self._added)):
+                    if record != previous:
+                        out.write(record)
+                        previous = record
+            if self._map:
+                self._map.close()
+                self._map = None
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+# ---- blobの供給元 ----
+
+def _git_output(repo: str, *args: str) -> str:
+    result = subprocess.run(['git', '-C', repo, *args], stdout=subprocess.PIPE, check=True)
+    return result.stdout.decode().strip()
+
+
+def git_repository_info(repo: str) -> Tuple[Optional[str], str]:
+    """
+    (ワーキングツリーのトップレベル, オブジェクト形式) を取得する
+
+    ベアリポジトリではトップレベルは None。gitリポジトリでなければ例外を送出します。
+    """
+    is_bare, object_format = _git_output(
+        repo, 'rev-parse', '--is-bare-repository', '--show-object-format').splitlines()
+    toplevel = None if is_bare == 'true' else _git_output(repo, 'rev-parse', '--show-toplevel')
+    return toplevel, object_format if object_format in OID_HEX_WIDTH else 'sha1'
+
+
+def git_blob_hash(data: bytes, object_format: str = 'sha1') -> str:
+    """gitと同じ方式でblobのオブジェクトハッシュを計算"""
+    header = f"blob {len(data)}\0".encode()
+    return hashlib.new(object_format, header + data).hexdigest()
+
+
+def _check_returncodes(processes: List[subprocess.Popen]) -> None:
+    for proc in processes:
+        if proc.returncode:
+            raise subprocess.CalledProcessError(proc.returncode, proc.args)
+
+
+def _iter_git_fields(repo: str, *args: str) -> Iterator[str]:
+    """`git <args> -z` のNUL区切り出力をストリーム読み出しする"""
+    proc = subprocess.Popen(['git', '-C', repo, *args, '-z'], stdout=subprocess.PIPE)
+    completed = False
+    try:
+        buffer = b''
+        while True:
+            chunk = proc.stdout.read(65536)
+            if not chunk:
+                break
+            *fields, buffer = (buffer + chunk).split(b'\0')
+            for raw in fields:
+                yield raw.decode('utf-8', errors='replace')
+        if buffer:
+            yield buffer.decode('utf-8', errors='replace')
+        completed = True
+    finally:
+        if not completed and proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        proc.wait()
+    _check_returncodes([proc])
+
+
+def _iter_batch_blobs(repo: str, source: str, candidates: Iterator[Tuple[str, str]],
+                      upstream: List[subprocess.Popen], max_size: int) -> Iterator[Tuple[str, str, str, bytes]]:
+    """
+    candidates の (オブジェクトハッシュ, パス) を `git cat-file --batch` で読み出す
+
+    candidates は別スレッドから cat-file --batch へ投入し、読み出し側とは
+    有限長のキューで接続するため、件数に関わらずメモリ使用量は一定です。
+    """
+    batch = subprocess.Popen(
+        ['git', '-C', repo, 'cat-file', '--batch'],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+    )
+    processes = [*upstream, batch]
+    pending: "queue.Queue[Optional[Tuple[str, str]]]" = queue.Queue(maxsize=1024)
+    feeder_errors: List[Exception] = []
+
+    def feed() -> None:
+        try:
+            for oid, path in candidates:
+                pending.put((oid, path))
+                batch.stdin.write(oid.encode() + b'\n')
+                batch.stdin.flush()
+        except BrokenPipeError:
+            # cat-file --batch が終了済み（終了コードは呼び出し側で確認）
+            pass
+        except Exception as e:
+            feeder_errors.append(e)
+        finally:
+            pending.put(None)
+            try:
+                batch.stdin.close()
+            except BrokenPipeError:
+                pass
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    item: Optional[Tuple[str, str]] = ('', '')
+    completed = False
+    try:
+        while True:
+            item = pending.get()
+            if item is None:
+                break
+            oid, path = item
+            header = batch.stdout.readline().split()
+            if len(header) != 3 or header[1] != b'blob':
+                raise subprocess.SubprocessError(f"git cat-file --batch の応答が不正です: {header!r}")
+            size = int(header[2])
+            if size > max_size:
+                while size > 0:
+                    size -= len(batch.stdout.read(min(size, 65536)))
+                batch.stdout.read(1)
+                continue
+            data = batch.stdout.read(size)
+            batch.stdout.read(1)  # 末尾の改行
+            yield source, oid, path, data
+        completed = not feeder_errors
+    finally:
+        if not completed:
+            for proc in processes:
+                if proc.poll() is None:
+                    proc.kill()
+        # 途中終了時にfeederがキュー投入で止まらないよう終端まで読み捨てる
+        while item is not None:
+            item = pending.get()
+        feeder.join()
+        for proc in processes:
+            if proc.stdout:
+                proc.stdout.close()
+            proc.wait()
+    if feeder_errors:
+        raise feeder_errors[0]
+    _check_returncodes(processes)
+
+
+def iter_history_blobs(repo: str, cache: ScanCache, max_size: int) -> Iterator[Tuple[str, str, str, bytes]]:
+    """
+    全履歴に含まれるblobをストリーム読み出しする
+
+    rev-list → cat-file --batch-check でblobのみを抽出し、キャッシュにないものだけを
+    cat-file --batch で読み出します。rev-list は各オブジェクトを一度だけ出力するため、
+    履歴内の重複排除に追加のメモリは不要です。
+    """
+    rev_list = subprocess.Popen(
+        ['git', '-C', repo, 'rev-list', '--objects', '--all'],
+        stdout=subprocess.PIPE,
+    )
+    batch_check = subprocess.Popen(
+        ['git', '-C', repo, 'cat-file',
+         '--batch-check=%(objectname) %(objecttype) %(objectsize) %(rest)'],
+        stdin=rev_list.stdout, stdout=subprocess.PIPE,
+    )
+    rev_list.stdout.close()
+
+    def candidates() -> Iterator[Tuple[str, str]]:
+        for raw in batch_check.stdout:
+            parts = raw.rstrip(b'\n').split(b' ', 3)
+            if len(parts) < 3 or parts[1] != b'blob' or int(parts[2]) > max_size:
+                continue
+            oid = parts[0].decode()
+            if oid in cache:
+                continue
+            yield oid, parts[3].decode('utf-8', errors='replace') if len(parts) > 3 else ''
+
+    yield from _iter_batch_blobs(repo, 'history', candidates(), [rev_list, batch_check], max_size)
+
+
+def iter_index_blobs(repo: str, cache: ScanCache, max_size: int) -> Iterator[Tuple[str, str, str, bytes]]:
+    """
+    ステージ済み（HEADと異なる）インデックスのblobを読み出す
+
+    ワーキングツリー側を後から書き換えても、次のコミットに含まれる内容を検出できます。
+    repo はワーキングツリーのトップレベルを指定します。
+    """
+    def candidates() -> Iterator[Tuple[str, str]]:
+        fields = _iter_git_fields(repo, 'diff', '--cached', '--raw', '--no-renames', '--no-abbrev',
+                                  '--diff-filter=d')
+        for status in fields:
+            path = next(fields)
+            # :<元のモード> <新しいモード> <元のハッシュ> <新しいハッシュ> <状態>
+            _, mode, _, oid, _ = status.split()
+            if mode == '160000' or oid in cache:
+                # サブモジュールはスキップ
+                continue
+            yield oid, path
+
+    yield from _iter_batch_blobs(repo, 'index', candidates(), [], max_size)
+
+
+def iter_worktree_blobs(repo: str, cache: ScanCache, max_size: int,
+                        object_format: str = 'sha1') -> Iterator[Tuple[str, str, str, bytes]]:
+    """
+    ワーキングツリーの変更・未追跡ファイルを読み出す
+
+    未変更の追跡ファイルは履歴・インデックス側でスキャン済みのため対象外です。
+    repo はワーキングツリーのトップレベルを指定します（パスはトップレベルからの相対パス）。
+    """
+    for path in _iter_git_fields(repo, 'ls-files', '-m', '--others', '--exclude-standard'):
+        full_path = os.path.join(repo, path)
+        try:
+            if not os.path.isfile(full_path) or os.path.getsize(full_path) > max_size:
+                continue
+            with open(full_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            continue
+        oid = git_blob_hash(data, object_format)
+        if oid in cache:
+            continue
+        yield 'worktree', oid, path, data
+
+
+# ---- 誤検出の抑止 ----
+
+def load_ignore_rules(ignore_file: Optional[str]) -> List[Tuple[str, Optional[str]]]:
+    """
+    除外ルールを読み込む
+
+    1行1ルールで `パスのglob [キー名]` 形式。キー名を省略するとファイル全体を除外します。
+    パスの代わりに `blob:<オブジェクトハッシュ>` を指定すると、履歴中の特定の内容のみを除外します。
+    """
+    rules: List[Tuple[str, Optional[str]]] = []
+    if not ignore_file or not os.path.exists(ignore_file):
+        return rules
+    with open(ignore_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            fields = line.split('#', 1)[0].split()
+            if fields:
+                rules.append((fields[0], fields[1] if len(fields) > 1 else None))
+    return rules
+
+
+def _matches_rule(finding: Finding, pattern: str) -> bool:
+    if pattern.startswith('blob:'):
+        return finding.blob == pattern[len('blob:'):]
+    return fnmatch.fnmatch(finding.path, pattern)
+
+
+def is_ignored(finding: Finding, rules: List[Tuple[str, Optional[str]]]) -> bool:
+    return any(
+        _matches_rule(finding, pattern) and (key is None or key == finding.key)
+        for pattern, key in rules
+    )
+
+
+# ---- パイプライン ----
+
+def scan(repo: str, workers: int, history: bool, worktree: bool, max_size: int,
+         cache_file: Optional[str] = None, ignore_file: Optional[str] = None) -> Iterator[Finding]:
+    """
+    blobをマルチプロセスでスキャンし、検出結果を逐次返す
+
+    パスはリポジトリのトップレベルからの相対パスです（repo がサブディレクトリでも同様）。
+    同一blobは実行中一度だけスキャンし、キャッシュには検出のなかったblobのみを
+    記録するため、検出済みのシークレットは削除されるまで毎回報告されます。
+    """
+    toplevel, object_format = git_repository_info(repo)
+    root = toplevel or repo
+    width = OID_HEX_WIDTH[object_format]
+    cache = ScanCache(cache_file, SecretLeakScanner().fingerprint(), width)
+    rules = load_ignore_rules(ignore_file or os.path.join(root, DEFAULT_IGNORE_FILE))
+    # 実行中にスキャン済みのblob（履歴とワーキングツリー等の重複排除用）
+    scanned = OidRunSet(width)
+
+    def sources() -> Iterator[Tuple[str, str, str, bytes]]:
+        if history:
+            for task in iter_history_blobs(root, cache, max_size):
+                scanned.add(task[1])
+                yield task
+        if worktree and toplevel:
+            for producer in (iter_index_blobs(root, cache, max_size),
+                             iter_worktree_blobs(root, cache, max_size, object_format)):
+                for task in producer:
+                    if task[1] in scanned:
+                        continue
+                    scanned.add(task[1])
+                    yield task
+
+    max_inflight = workers * INFLIGHT_PER_WORKER
+    inflight: deque = deque()
+
+    def complete(result) -> List[Finding]:
+        oid, findings = result.get()
+        if not findings:
+            cache.add(oid)
+        return [finding for finding in findings if not is_ignored(finding, rules)]
+
+    try:
+        with Pool(processes=workers, initializer=_init_worker) as pool:
+            for task in sources():
+                inflight.append(pool.apply_async(_scan_blob, (task,)))
+                while len(inflight) >= max_inflight:
+                    yield from complete(inflight.popleft())
+            while inflight:
+                yield from complete(inflight.popleft())
+    finally:
+        scanned.close()
+        cache.close()
+
+
+def format_finding(finding: Finding) -> str:
+    label = 'AWS Secrets Manager' if finding.category == 'aws' else 'GitHub Secrets'
+    return (f"  [{finding.source}] {finding.path}:{finding.line}  "
+            f"{finding.key} = {finding.masked_value}  ({label}, blob {finding.blob[:10]})")
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"1以上の整数を指定してください: {value}")
+    return number
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='git履歴とワーキングツリーのシークレット漏洩スキャン')
+    parser.add_argument('--repo', default='.', help='スキャン対象のリポジトリ（デフォルト: カレントディレクトリ）')
+    parser.add_argument('--workers', type=_positive_int, default=os.cpu_count() or 1, help='ワーカープロセス数')
+    parser.add_argument('--no-history', action='store_true', help='git履歴をスキャンしない')
+    parser.add_argument('--no-worktree', action='store_true', help='インデックスとワーキングツリーをスキャンしない')
+    parser.add_argument('--max-blob-size', type=_positive_int, default=1024 * 1024,
+                        help='スキャン対象の最大blobサイズ（バイト）')
+    parser.add_argument('--cache', help='検出のなかったblobのハッシュを保存するファイル')
+    parser.add_argument('--ignore-file', help=f'除外ルールファイル（デフォルト: <トップレベル>/{DEFAULT_IGNORE_FILE}）')
+    parser.add_argument('--json', action='store_true', help='検出結果をJSON Lines形式で出力')
+    args = parser.parse_args(argv)
+
+    if not args.json:
+        print("🚀 シークレット漏洩スキャン")
+        print("=" * 60)
+
+    count = 0
+    try:
+        for finding in scan(args.repo, args.workers, not args.no_history, not args.no_worktree,
+                            args.max_blob_size, args.cache, args.ignore_file):
+            count += 1
+            if args.json:
+                print(json.dumps(asdict(finding), ensure_ascii=False), flush=True)
+            else:
+                print(format_finding(finding), flush=True)
+    except BrokenPipeError:
+        # 出力先（head等）が先に終了した場合
+        return 1 if count else 0
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"❌ スキャンエラー: {e}", file=sys.stderr)
+        return 2
+
+    if not args.json:
+        print("\n📊 統計")
+        print(f"  検出件数: {count} 件")
+        if count:
+            print("⚠️  検出されたシークレットはローテーションし、履歴から削除してください")
+        else:
+            print("✅ シークレットは検出されませんでした")
+
+    return 1 if count else 0
+
+
+if __name__ == "__main__":
+    exit(main())